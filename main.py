@@ -1,201 +1,371 @@
+import heapq
+from array import array
 from collections import defaultdict, deque
 from typing import Dict, List, Set, Tuple
 
+def _bfs_hops(adjacency: List[List[int]], source: int, typecode: str, inf: int) -> array:
+    """Hop count from source to every node of an integer adjacency list.
+
+    Unreachable nodes keep the value inf.
+    """
+    dist = array(typecode, [inf]) * len(adjacency)
+    dist[source] = 0
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        next_dist = dist[current] + 1
+        for neighbor in adjacency[current]:
+            if dist[neighbor] == inf:
+                dist[neighbor] = next_dist
+                queue.append(neighbor)
+    return dist
+
+def _interference_adjacency(senders: List[int], receivers: List[int]) -> List[Set[int]]:
+    """Neighbours of each transmission i = (senders[i], receivers[i]).
+
+    Transmissions interfere if:
+    1. They share a sender
+    2. They share a receiver
+    3. A receiver in one is a sender in another
+    i.e. exactly when they appear together in some device's bucket.
+    """
+    # Index transmissions by the devices they touch
+    endpoint_to_trans: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(senders)):
+        endpoint_to_trans[senders[i]].append(i)
+        endpoint_to_trans[receivers[i]].append(i)
+
+    adjacency = [set() for _ in range(len(senders))]
+    for trans_ids in endpoint_to_trans.values():
+        for a in range(len(trans_ids)):
+            i = trans_ids[a]
+            for b in range(a + 1, len(trans_ids)):
+                j = trans_ids[b]
+                adjacency[i].add(j)
+                adjacency[j].add(i)
+    return adjacency
+
+def _packet_degrees(graph: List[Set[int]], counts: List[int]) -> List[int]:
+    """Degree of each packet in the graph where every packet is its own node.
+
+    A packet conflicts with all packets of neighboring nodes and with the
+    other packets of its own node.
+    """
+    return [sum(counts[neighbor] for neighbor in graph[node]) + counts[node] - 1
+            for node in range(len(graph))]
+
+def _dsatur_color_small(graph: List[Set[int]], counts: List[int]) -> List[int]:
+    """DSatur for graphs of at most 64 nodes, with node sets held as bitmasks."""
+    adjacency = [0] * len(graph)
+    for node, neighbors in enumerate(graph):
+        for neighbor in neighbors:
+            adjacency[node] |= 1 << neighbor
+    
+    degrees = _packet_degrees(graph, counts)
+    colors = [0] * len(graph)
+    remaining = list(counts)
+    blocked = [0] * len(graph)  # Colors used by the node itself or its colored neighbors
+    pending_nodes = 0
+    for node in range(len(graph)):
+        if remaining[node] > 0:
+            pending_nodes |= 1 << node
+    while pending_nodes:
+        # Most saturated node first, ties broken by degree, then by lowest id
+        node = -1
+        best = (-1, -1)
+        pending = pending_nodes
+        while pending:
+            low = pending & -pending
+            pending ^= low
+            candidate = low.bit_length() - 1
+            key = (blocked[candidate].bit_count(), degrees[candidate])
+            if key > best:
+                node, best = candidate, key
+        
+        # Color one packet of the node; its other packets stay selectable
+        color = ~blocked[node] & (blocked[node] + 1)
+        colors[node] |= color
+        blocked[node] |= color
+        remaining[node] -= 1
+        if remaining[node] == 0:
+            pending_nodes ^= 1 << node
+        pending = adjacency[node] & pending_nodes
+        while pending:
+            low = pending & -pending
+            pending ^= low
+            blocked[low.bit_length() - 1] |= color
+    
+    return colors
+
+def _dsatur_color(graph: List[Set[int]], counts: List[int]) -> List[int]:
+    """Color graph with DSatur; node i takes counts[i] colors.
+
+    Packets are colored one at a time, so a node with packets left competes
+    with the others on saturation after each of its colors. Returns a bitmask
+    of the colors assigned to each node.
+    """
+    if len(graph) <= 64:
+        return _dsatur_color_small(graph, counts)
+    
+    degrees = _packet_degrees(graph, counts)
+    colors = [0] * len(graph)
+    remaining = list(counts)
+    blocked = [0] * len(graph)  # Colors used by the node itself or its colored neighbors
+    saturation = [0] * len(graph)
+    
+    # Most saturated node first, ties broken by degree
+    heap = [(0, -degrees[node], node) for node in range(len(graph)) if remaining[node] > 0]
+    heapq.heapify(heap)
+    while heap:
+        neg_sat, neg_degree, node = heapq.heappop(heap)
+        if remaining[node] == 0 or -neg_sat != saturation[node]:
+            continue  # Stale entry
+        
+        # Color one packet of the node; its other packets stay selectable
+        color = ~blocked[node] & (blocked[node] + 1)
+        colors[node] |= color
+        blocked[node] |= color
+        remaining[node] -= 1
+        if remaining[node] > 0:
+            saturation[node] += 1
+            heapq.heappush(heap, (-saturation[node], neg_degree, node))
+        for neighbor in graph[node]:
+            if remaining[neighbor] == 0 or blocked[neighbor] & color:
+                continue
+            blocked[neighbor] |= color
+            saturation[neighbor] += 1
+            heapq.heappush(heap, (-saturation[neighbor], -degrees[neighbor], neighbor))
+    
+    return colors
+
 class NetworkScheduler:
     def __init__(self):
-        self.devices = set()
-        self.connections = defaultdict(set)
-        self.original_packets = {}  # Packets originated by each device
-        self.forwarding_paths = defaultdict(list)  # List of paths each packet must take
-        self.total_transmissions = defaultdict(lambda: defaultdict(int))  # {sender: {receiver: count}}
-        self.interference_graph = defaultdict(set)
-        self.shortest_path = defaultdict(lambda: defaultdict(int)) # {node: {node: count }}
+        # Devices are interned to dense integer ids; names are only used at the API boundary
+        self._id_of: Dict[str, int] = {}
+        self._name_of: List[str] = []
+        self.connections: List[Set[int]] = []  # [sender id] -> receiver ids
+        self.original_packets: List[int] = []  # Packets originated by each device id
+        self.total_transmissions: Dict[Tuple[int, int], int] = {}  # {(sender id, receiver id): count}
+        self.interference_graph = []  # [transmission] -> interfering transmissions
+        self.shortest_path: List[array] = []  # [device id][device id] -> hops
+        self._indptr: List[int] = [0]  # CSR view of connections, built by _finalize_topology
+        self._indices: List[int] = []
+        self._topo_order: List[int] = []  # Device ids, upstream before downstream
+        self._topology_version = 0  # Bumped on every device/path change
+        self._csr_cached_version = -1
+        self._apsp_cached_version = -1
+        self._forwarding_cache_key = None
         
     def add_device(self, device_id: str, packets: int) -> None:
         """Add a device with its original packets per frame."""
-        self.devices.add(device_id)
-        self.original_packets[device_id] = packets
+        if device_id in self._id_of:
+            self.original_packets[self._id_of[device_id]] = packets
+        else:
+            self._id_of[device_id] = len(self._name_of)
+            self._name_of.append(device_id)
+            self.connections.append(set())
+            self.original_packets.append(packets)
+        self._topology_version += 1
         
     def add_transmission_path(self, sender: str, receiver: str) -> None:
         """Add a directional transmission path from sender to receiver."""
-        if sender not in self.devices or receiver not in self.devices:
+        if sender not in self._id_of or receiver not in self._id_of:
             raise ValueError("Both sender and receiver must be added as devices first")
-        self.connections[sender].add(receiver)
-
-    def _calculate_shortest_path_between_all_nodes(self) -> None:  # Floyd–Warshall algorithm
-        inf = 1e9 # infinity 
-        shortest_path = defaultdict(lambda: defaultdict(int))
-        for i in self.devices:
-            for j in self.devices:
-                shortest_path[i][j] = inf
-        
-        for i in self.devices:
-            shortest_path[i][i] = 0
-        
-        for sender in self.devices:
-            for receiver in self.connections[sender]:
-                shortest_path[sender][receiver] = 1
-                shortest_path[receiver][sender] = 1
-
-        for k_device in self.devices:
-            for i_device in self.devices:
-                for j_device in self.devices:
-                    shortest_path[i_device][j_device] = min(shortest_path[i_device][j_device], 
-                                                                shortest_path[i_device][k_device] + shortest_path[k_device][j_device])
-        self.shortest_path = shortest_path
+        self.connections[self._id_of[sender]].add(self._id_of[receiver])
+        self._topology_version += 1
 
-    def _calculate_forwarding_requirements(self) -> None:
-        """Calculate all required transmissions based on packet flows."""
-        self.total_transmissions.clear()
+    def _finalize_topology(self) -> None:
+        """Materialize connections as CSR arrays plus a topological device order.
+
+        Receivers of device u are indices[indptr[u]:indptr[u + 1]].
+        """
+        if self._csr_cached_version == self._topology_version:
+            return
+        indptr = [0]
+        indices = []
+        for receivers in self.connections:
+            indices.extend(sorted(receivers))
+            indptr.append(len(indices))
         
         # Compute in-degree for topological sorting
-        in_degree = {device: 0 for device in self.devices}
-        for sender in self.connections:
-            for receiver in self.connections[sender]:
-                in_degree[receiver] += 1
+        in_degree = [0] * len(self.connections)
+        for receiver in indices:
+            in_degree[receiver] += 1
                 
         # Initialize queue with devices having in-degree 0
-        queue = deque([device for device in self.devices if in_degree[device] == 0])
+        queue = deque([device for device in range(len(in_degree)) if in_degree[device] == 0])
+        topo_order = []
+        while queue:
+            current = queue.popleft()
+            topo_order.append(current)
+            for j in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[j]
+                # Decrease in-degree and add to queue if zero
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    queue.append(neighbor)
+                    
+        # Check for cycles
+        if len(topo_order) < len(in_degree):
+            raise ValueError("Network topology contains cycles, which is not supported.")
+        
+        self._indptr = indptr
+        self._indices = indices
+        self._topo_order = topo_order
+        self._csr_cached_version = self._topology_version
+
+    def _calculate_shortest_path_between_all_nodes(self) -> None:  # BFS from every node
+        if self._apsp_cached_version == self._topology_version:
+            return
+        size = len(self._name_of)
+        
+        # Hop counts are below the number of devices, so store each row in the narrowest
+        # unsigned type that still leaves its maximum value free to mark "unreachable"
+        if size <= 255:
+            typecode = 'B'
+        elif size <= 65535:
+            typecode = 'H'
+        else:
+            typecode = 'L'
+        inf = (1 << 8 * array(typecode).itemsize) - 1  # Largest value of the row type
+        indptr, indices = self._indptr, self._indices
+        
+        # Paths are measured in hops regardless of transmission direction
+        undirected_adj: List[List[int]] = [[] for _ in range(size)]
+        for sender in range(size):
+            for j in range(indptr[sender], indptr[sender + 1]):
+                receiver = indices[j]
+                undirected_adj[sender].append(receiver)
+                undirected_adj[receiver].append(sender)
+
+        self.shortest_path = [_bfs_hops(undirected_adj, source, typecode, inf) for source in range(size)]
+        self._apsp_cached_version = self._topology_version
+
+    def _calculate_forwarding_requirements(self) -> None:
+        """Calculate all required transmissions based on packet flows."""
+        cache_key = (self._topology_version, tuple(self.original_packets))
+        if self._forwarding_cache_key == cache_key:
+            return
+        self._forwarding_cache_key = None
+        self.total_transmissions.clear()
+        indptr, indices = self._indptr, self._indices
         
         # Initialize packet counts: total_packets[device] = original_packets + received packets
-        total_packets = defaultdict(int)
-        for device in self.devices:
-            total_packets[device] += self.original_packets.get(device, 0)
+        total_packets = list(self.original_packets)
         
-        while queue:
-            current = queue.popleft()
+        # Every sender is visited after all of its upstream devices
+        for current in self._topo_order:
             current_packets = total_packets[current]
             
-            for neighbor in self.connections[current]:
+            for j in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[j]
                 # Add current's packets to the neighbor's incoming packets
                 total_packets[neighbor] += current_packets
                 
                 # Record the transmission
-                self.total_transmissions[current][neighbor] += current_packets
-                
-                # Decrease in-degree and add to queue if zero
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
+                edge = (current, neighbor)
+                self.total_transmissions[edge] = self.total_transmissions.get(edge, 0) + current_packets
                     
-        # Check for cycles
-        if any(degree > 0 for degree in in_degree.values()):
-            raise ValueError("Network topology contains cycles, which is not supported.")
+        self._forwarding_cache_key = cache_key
         
     def _build_interference_graph(self) -> None:
-        """Build interference graph based on network topology."""
-        # Create list of all required transmissions
+        """Build interference graph over unique transmission edges."""
+        # Create list of unique (sender, receiver, count) transmissions; every copy of
+        # an edge interferes with the others, so multiplicity is handled when coloring
+        # Walk edges in topological order so transmission ids follow the packet flow
+        indptr, indices = self._indptr, self._indices
         transmissions = []
-        for sender in self.devices:
-            for receiver, count in self.total_transmissions[sender].items():
-                for _ in range(count):
-                    transmissions.append((sender, receiver))
-        
-        # Create nodes in interference graph for each transmission
-        for i, trans1 in enumerate(transmissions):
-            sender1, receiver1 = trans1
-            for j, trans2 in enumerate(transmissions):
-                if i >= j:
-                    continue
-                    
-                sender2, receiver2 = trans2
-                
-                # Transmissions interfere if:
-                # 1. They share a sender
-                # 2. They share a receiver
-                # 3. A receiver in one is a sender in another
-                if (sender1 == sender2 or
-                    receiver1 == receiver2 or
-                    sender1 == receiver2 or
-                    sender2 == receiver1):
-                    self.interference_graph[i].add(j)
-                    self.interference_graph[j].add(i)
-        
-        self.transmissions = transmissions
+        for sender in self._topo_order:
+            for j in range(indptr[sender], indptr[sender + 1]):
+                receiver = indices[j]
+                count = self.total_transmissions.get((sender, receiver), 0)
+                if count > 0:
+                    transmissions.append((sender, receiver, count))
         
-    def _color_graph(self) -> Dict[int, int]:
-        """Color the interference graph using a greedy algorithm."""
-        colors = {}
+        self.interference_graph = _interference_adjacency(
+            [sender for sender, _, _ in transmissions],
+            [receiver for _, receiver, _ in transmissions])
         
-        # Sort nodes by degree for better coloring
-        nodes = sorted(self.interference_graph.keys(), 
-                      key=lambda x: len(self.interference_graph[x]),
-                      reverse=True)
+        self.transmissions = transmissions
         
-        for node in nodes:
-            used_colors = {colors[neighbor] 
-                         for neighbor in self.interference_graph[node] 
-                         if neighbor in colors}
-            
-            color = 0
-            while color in used_colors:
-                color += 1
-            colors[node] = color
-            
-        return colors
+    def _color_graph(self) -> List[int]:
+        """Color the interference graph using DSatur.
+
+        Each transmission takes ``count`` colors, one per packet; the result
+        holds a bitmask of those colors per transmission.
+        """
+        counts = [count for _, _, count in self.transmissions]
+        return _dsatur_color(self.interference_graph, counts)
         
     def generate_schedule(self) -> List[List[Tuple[str, str]]]:
         """Generate an optimized transmission schedule."""
+        self._finalize_topology()
         self._calculate_shortest_path_between_all_nodes()
         self._calculate_forwarding_requirements()
         self._build_interference_graph()
         colors = self._color_graph()
         
-        # Group transmissions by time slot (color)
-        schedule = defaultdict(list)
-        for trans_id, color in colors.items():
-            schedule[color].append(self.transmissions[trans_id])
-            
-        # Convert to list of time slots
-        max_slot = max(colors.values()) if colors else -1
+        # Each transmission is sent once in every slot whose bit is set in its color mask.
+        # Slot contents only change where some mask starts or ends a run of set bits,
+        # so build each distinct slot once
+        toggles_at = defaultdict(list)
+        for trans_id, mask in enumerate(colors):
+            toggles = mask ^ (mask << 1)
+            while toggles:
+                low = toggles & -toggles
+                toggles ^= low
+                toggles_at[low.bit_length() - 1].append(trans_id)
+        
+        names = self._name_of
+        active = set()
+        boundaries = sorted(toggles_at)
         final_schedule = []
-        for slot in range(max_slot + 1):
-            final_schedule.append(schedule[slot])
+        for slot, next_boundary in zip(boundaries, boundaries[1:]):
+            active.symmetric_difference_update(toggles_at[slot])
+            slot_transmissions = []
+            for trans_id in sorted(active):
+                sender, receiver, _ = self.transmissions[trans_id]
+                slot_transmissions.append((names[sender], names[receiver]))
+            for _ in range(slot, next_boundary):
+                final_schedule.append(list(slot_transmissions))
 
         return final_schedule
     
     def optimize_schedule(self, schedule: List[List[Tuple[str, str]]]) -> List[List[List[Tuple[str, str]]]]:
         optimized_schedule = []
+        sp = self.shortest_path
+        id_of = self._id_of
 
-        # function to check if transmission 3 hops away
-        def check_shortest_path(transmission1: Tuple[str, str], transmission2: Tuple[str, str]) -> int:
-            path1 = self.shortest_path[transmission1[0]][transmission2[1]]
-            path2 = self.shortest_path[transmission1[1]][transmission2[0]]
-
-            return min(path1, path2)
+        # Consecutive slots often repeat the same transmissions, so pack each distinct slot once
+        packed_slots: Dict[Tuple[Tuple[str, str], ...], List[List[Tuple[str, str]]]] = {}
 
         # optimizing transmission into one channel
         for time_slot, transmissions in enumerate(schedule):
-            channel = []
-            added_transmissions_check = {}
-            for i in range(len(transmissions)):
-                transmission_x = transmissions[i]
-
-                # if transmission already added to one channel, then no need to iterate it 
-                if transmission_x in added_transmissions_check:
-                    continue
-                
-                added_transmissions_check[transmission_x] = True
-                added_transmissions = [transmission_x]
-                for j in range(i+1, len(transmissions)):
-                    transmission_y = transmissions[j]
-                    check = True
+            slot_key = tuple(transmissions)
+            if slot_key in packed_slots:
+                optimized_schedule.append([list(channel) for channel in packed_slots[slot_key]])
+                continue
 
-                    # iterate through all transmission in one channel
-                    for k_transmission in added_transmissions:
-                        path = check_shortest_path(transmission_y, k_transmission)
-                        if path < 3:
-                            check = False
-                            break
+            # minpath[i][j]: hops from transmission i to transmission j, i.e. the
+            # shorter of sender_i -> receiver_j and receiver_i -> sender_j
+            sender_ids = [id_of[sender] for sender, _ in transmissions]
+            receiver_ids = [id_of[receiver] for _, receiver in transmissions]
+            minpath = [[min(sp[sender_ids[i]][receiver_ids[j]], sp[receiver_ids[i]][sender_ids[j]])
+                        for j in range(len(transmissions))]
+                       for i in range(len(transmissions))]
 
-                    # if shortest path is less than 3, then unite in one channel
-                    if check:
-                        added_transmissions.append(transmission_y)
-                        added_transmissions_check[transmission_y] = True
+            # Transmissions closer than 3 hops conflict; each color of the conflict graph is a channel
+            conflicts = [{j for j in range(len(transmissions)) if j != i and minpath[i][j] < 3}
+                         for i in range(len(transmissions))]
+            channel_of = [mask.bit_length() - 1
+                          for mask in _dsatur_color(conflicts, [1] * len(transmissions))]
 
-                channel.append(added_transmissions)
+            channel = [[] for _ in range(max(channel_of, default=-1) + 1)]
+            for i, channel_id in enumerate(channel_of):
+                channel[channel_id].append(transmissions[i])
 
-            optimized_schedule.append(channel)
+            packed_slots[slot_key] = channel
+            optimized_schedule.append([list(added) for added in channel])
 
         return optimized_schedule
 
@@ -216,9 +386,11 @@ class NetworkScheduler:
         
         print("\nTransmission Requirements:")
         print("-------------------------")
-        for sender in sorted(self.total_transmissions.keys()):
-            for receiver, count in sorted(self.total_transmissions[sender].items()):
-                print(f"{sender} → {receiver}: {count} transmission(s)")
+        names = self._name_of
+        requirements = sorted((names[sender], names[receiver], count)
+                              for (sender, receiver), count in self.total_transmissions.items())
+        for sender, receiver, count in requirements:
+            print(f"{sender} → {receiver}: {count} transmission(s)")
 
 # Example usage for the given topology
 def example_usage():
@@ -0,0 +1,147 @@
+import os
+import random
+import unittest
+from typing import List, Set
+
+from main import NetworkScheduler, _dsatur_color, _dsatur_color_small
+
+def load_scheduler(file_name: str) -> NetworkScheduler:
+    """Build a scheduler from an input file in the format read by example_usage."""
+    scheduler = NetworkScheduler()
+    with open(os.path.join(os.path.dirname(__file__), file_name), 'r') as f:
+        lines = f.readlines()
+        for device, packet_number in zip(lines[1].split(), lines[2].split()):
+            scheduler.add_device(device, int(packet_number))
+        for line in lines[4:]:
+            if line.strip():
+                sender, receiver = line.split()
+                scheduler.add_transmission_path(sender, receiver)
+    return scheduler
+
+def crown_graph(n: int) -> List[Set[int]]:
+    """K(n, n) minus a perfect matching: u_i = 2i, v_i = 2i + 1, u_i ~ v_j for i != j.
+
+    Largest-first in id order needs n colors here; the graph is bipartite.
+    """
+    graph = [set() for _ in range(2 * n)]
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                graph[2 * i].add(2 * j + 1)
+                graph[2 * j + 1].add(2 * i)
+    return graph
+
+def slots_used(colors: List[int]) -> int:
+    return max((mask.bit_length() for mask in colors), default=0)
+
+def assert_proper(test: unittest.TestCase, graph: List[Set[int]], counts: List[int], colors: List[int]) -> None:
+    for node, neighbors in enumerate(graph):
+        test.assertEqual(colors[node].bit_count(), counts[node])
+        for neighbor in neighbors:
+            test.assertFalse(colors[node] & colors[neighbor])
+
+class ColorGraphTest(unittest.TestCase):
+    def test_crown_graph_uses_two_colors(self):
+        graph = crown_graph(5)
+        colors = _dsatur_color(graph, [1] * len(graph))
+        assert_proper(self, graph, [1] * len(graph), colors)
+        self.assertEqual(slots_used(colors), 2)
+
+    def test_even_cycle_with_two_packets_per_edge(self):
+        # Each copy pair forms a clique, so two packets per node on a bipartite cycle need 4 colors
+        graph = [{(i - 1) % 6, (i + 1) % 6} for i in range(6)]
+        colors = _dsatur_color(graph, [2] * 6)
+        assert_proper(self, graph, [2] * 6, colors)
+        self.assertEqual(slots_used(colors), 4)
+
+    def test_heap_and_bitmask_paths_agree(self):
+        # More than 64 nodes sends _dsatur_color down the heap path
+        rng = random.Random(7)
+        for size, density in ((80, 0.1), (100, 0.3)):
+            graph = [set() for _ in range(size)]
+            for i in range(size):
+                for j in range(i + 1, size):
+                    if rng.random() < density:
+                        graph[i].add(j)
+                        graph[j].add(i)
+            counts = [rng.randint(1, 4) for _ in range(size)]
+            colors = _dsatur_color(graph, counts)
+            assert_proper(self, graph, counts, colors)
+            self.assertEqual(colors, _dsatur_color_small(graph, counts))
+
+class GenerateScheduleTest(unittest.TestCase):
+    def test_sample_input_uses_minimum_slots(self):
+        # The 17 transmissions touching F can never share a slot
+        schedule = load_scheduler('input.txt').generate_schedule()
+        self.assertEqual(len(schedule), 17)
+
+    def test_packets_of_one_edge_are_colored_separately(self):
+        # D2 -> D3 and D3 -> D4 carry 4 packets each and interfere, so 8 slots is the minimum
+        scheduler = NetworkScheduler()
+        for i, packets in enumerate([2, 1, 1, 0, 2]):
+            scheduler.add_device(f"D{i}", packets)
+        for sender, receiver in [(0, 2), (0, 4), (1, 2), (1, 4), (2, 3), (3, 4)]:
+            scheduler.add_transmission_path(f"D{sender}", f"D{receiver}")
+        self.assertEqual(len(scheduler.generate_schedule()), 8)
+
+    def test_every_packet_is_scheduled_once_per_slot(self):
+        scheduler = load_scheduler('input.txt')
+        schedule = scheduler.generate_schedule()
+        names = scheduler._name_of
+        sent = {}
+        for slot in schedule:
+            self.assertEqual(len(slot), len(set(slot)))
+            for sender, receiver in slot:
+                sent[(sender, receiver)] = sent.get((sender, receiver), 0) + 1
+        expected = {(names[sender], names[receiver]): count
+                    for (sender, receiver), count in scheduler.total_transmissions.items() if count}
+        self.assertEqual(sent, expected)
+
+class TopologyCacheTest(unittest.TestCase):
+    def requirements(self, scheduler: NetworkScheduler) -> dict:
+        names = scheduler._name_of
+        return {(names[sender], names[receiver]): count
+                for (sender, receiver), count in scheduler.total_transmissions.items()}
+
+    def test_changes_invalidate_cached_results(self):
+        scheduler = NetworkScheduler()
+        for device in 'ABC':
+            scheduler.add_device(device, 1)
+        scheduler.add_transmission_path('A', 'B')
+        self.assertEqual(scheduler.generate_schedule(), [[('A', 'B')]])
+        self.assertEqual(self.requirements(scheduler), {('A', 'B'): 1})
+
+        scheduler.add_transmission_path('B', 'C')
+        self.assertEqual(len(scheduler.generate_schedule()), 3)
+        self.assertEqual(self.requirements(scheduler), {('A', 'B'): 1, ('B', 'C'): 2})
+        self.assertEqual(scheduler.shortest_path[scheduler._id_of['A']][scheduler._id_of['C']], 2)
+
+        scheduler.add_device('A', 3)
+        self.assertEqual(len(scheduler.generate_schedule()), 7)
+        self.assertEqual(self.requirements(scheduler), {('A', 'B'): 3, ('B', 'C'): 4})
+
+        scheduler.add_transmission_path('C', 'A')
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                scheduler.generate_schedule()
+
+class OptimizeScheduleTest(unittest.TestCase):
+    def test_channels_partition_slot_and_keep_three_hops(self):
+        scheduler = load_scheduler('input.txt')
+        schedule = scheduler.generate_schedule()
+        optimized = scheduler.optimize_schedule(schedule)
+        sp = scheduler.shortest_path
+        id_of = scheduler._id_of
+        self.assertEqual(len(optimized), len(schedule))
+        for transmissions, channels in zip(schedule, optimized):
+            packed = [transmission for channel in channels for transmission in channel]
+            self.assertEqual(sorted(packed), sorted(transmissions))
+            for channel in channels:
+                for i, (sender_i, receiver_i) in enumerate(channel):
+                    for sender_j, receiver_j in channel[i + 1:]:
+                        hops = min(sp[id_of[sender_i]][id_of[receiver_j]],
+                                   sp[id_of[receiver_i]][id_of[sender_j]])
+                        self.assertGreaterEqual(hops, 3)
+
+if __name__ == "__main__":
+    unittest.main()